@@ -1,11 +1,21 @@
 # A script to convert video files to audio files using FFmpeg.
+import asyncio
+import collections
+import functools
 import os
+import re
+import shutil
 import subprocess
-import threading
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import logging
 import sys
+from types import MappingProxyType
+
+try:
+    from tqdm import tqdm
+except ImportError:  # tqdm is optional, only used for batch progress bars
+    tqdm = None
 
 # Logging configuration
 logging.basicConfig(
@@ -16,6 +26,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The "Input #k, ..." header ffmpeg prints before describing each input,
+# and the "  Duration: HH:MM:SS.xx" line below it. The two-space indent
+# keeps metadata tags (indented further) from matching.
+_INPUT_RE = re.compile(r"Input #(\d+),")
+_DURATION_RE = re.compile(r"  Duration: (\d+):(\d+):([\d.]+)")
+
+# Supported formats
+SUPPORTED_INPUT_FORMATS = frozenset({
+    ".mp4",
+    ".mkv",
+    ".avi",
+    ".mov",
+    ".wmv",
+    ".flv",
+    ".webm",
+})
+
+# Audio encoder used for each output format
+_CODEC_MAP = MappingProxyType({
+    "mp3": "libmp3lame",
+    "wav": "pcm_s16le",
+    "m4a": "aac",
+    "flac": "flac",
+})
+
+SUPPORTED_OUTPUT_FORMATS = frozenset(_CODEC_MAP)
+
+# Muxer for each output format. ffmpeg writes to a ".part" file, so it
+# can't guess the container from the extension.
+_MUXER_MAP = MappingProxyType({
+    "mp3": "mp3",
+    "wav": "wav",
+    "m4a": "ipod",
+    "flac": "flac",
+})
+
+# Output formats that can take the source audio stream as is, mapped to
+# the codec the source must already be in
+_COPY_CODECS = MappingProxyType({"m4a": "aac"})
+
+
+# Global ffmpeg options. Existing outputs are handled in _prepare; "-y"
+# only lets ffmpeg replace a stale .part file from an interrupted run.
+_FFMPEG_HEAD = ("ffmpeg", "-y", "-loglevel", "error")
+# ffmpeg reports the input duration and its own encode position, so there
+# is no need for a separate ffprobe run. The "info" level is required for
+# the Duration line.
+_FFMPEG_PROGRESS_HEAD = (
+    "ffmpeg", "-y", "-hide_banner", "-loglevel", "info",
+    "-progress", "pipe:1", "-nostats",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_available():
+    # A PATH lookup answers "is it installed?" without starting ffmpeg
+    return shutil.which("ffmpeg") is not None
+
+
+def _default_workers():
+    # One ffmpeg per physical core, approximated as half the logical CPUs
+    return max(1, (os.cpu_count() or 1) // 2)
+
 
 class VideoToAudioConverter:
     def __init__(
@@ -26,6 +99,9 @@ class VideoToAudioConverter:
         delete_original=False,
         overwrite=False,
         output_format="mp3",
+        stream_copy=True,
+        hwaccel=None,
+        force=False,
     ):
         self.bitrate = bitrate
         self.samplerate = samplerate
@@ -33,139 +109,517 @@ class VideoToAudioConverter:
         self.delete_original = delete_original
         self.overwrite = overwrite
         self.output_format = output_format.lower()
-
-        # Supported formats
-        self.supported_input_formats = {
-            ".mp4",
-            ".mkv",
-            ".avi",
-            ".mov",
-            ".wmv",
-            ".flv",
-            ".webm",
-        }
-        self.supported_output_formats = {"mp3", "wav"}
+        self.stream_copy = stream_copy
+        self.hwaccel = hwaccel
+        self.force = force
+        # None for unsupported formats, which _prepare rejects
+        self.audio_codec = _CODEC_MAP.get(self.output_format)
+
+        # The output options only depend on the settings above, so they
+        # are built once and reused for every file
+        muxer = _MUXER_MAP.get(self.output_format)
+        self._encode_args = (
+            "-vn",  # no video
+            "-acodec",
+            self.audio_codec,
+            "-ab",
+            self.bitrate,
+            "-ar",
+            str(self.samplerate),
+            # Conversions run side by side, keep each encoder on one core
+            "-threads",
+            "1",
+            "-f",
+            muxer,
+        )
+        self._copy_args = ("-vn", "-acodec", "copy", "-f", muxer)
+        # Passed through as an input option, e.g. "auto", "cuda", "vaapi"
+        self._input_args = ("-hwaccel", hwaccel) if hwaccel else ()
 
         if output_dir:
             Path(output_dir).mkdir(parents=True, exist_ok=True)
 
+    @property
+    def supported_input_formats(self):
+        return SUPPORTED_INPUT_FORMATS
+
+    @property
+    def supported_output_formats(self):
+        return SUPPORTED_OUTPUT_FORMATS
+
     def check_ffmpeg_installed(self):
-        try:
-            subprocess.run(["ffmpeg", "-version"],
-                           capture_output=True, check=True)
+        return _ffmpeg_available()
+
+    def convert_video_to_audio(self, input_file, progress_callback=None):
+        input_file = os.fspath(input_file)
+        output_path = self._prepare(input_file)
+        if output_path is None:
+            return False
+        if self._up_to_date(input_file, output_path):
             return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+
+        try:
+            returncode, log = self._run_ffmpeg(
+                [input_file], [self._output_args(input_file, output_path)], progress_callback
+            )
+            if returncode == 0:
+                self._finish(input_file, output_path)
+                return True
+            else:
+                logger.error(f"Error converting {input_file}: {log}")
+                return False
+        finally:
+            self._discard_part(output_path)
+
+    def batch_convert(
+        self, files, progress_callback=None, max_workers=None, progress_bars=True
+    ):
+        """Convert several videos, running a few ffmpeg processes in parallel.
+
+        The files are spread over ``max_workers`` groups (by default one
+        per physical core, approximated as half the logical CPUs). Each
+        group is converted by a single ffmpeg run, see ``_convert_group``.
+        When tqdm is installed and ``progress_bars`` is true, an overall
+        bar counts finished files and each running group gets its own bar.
+        ``files`` may hold paths or the ``os.DirEntry`` objects of an
+        ``os.scandir`` pass, whose cached stat is then reused for the sizes.
+        Returns the number of converted files.
+        """
+        if not self.check_ffmpeg_installed():
+            logger.error("FFmpeg not found")
+            return 0
+
+        jobs = []
+        sizes = []
+        up_to_date = 0
+        claimed = set()
+        for file in files:
+            output_path = self._prepare(file)
+            if output_path is None:
+                continue
+            if not self._claim_output(file, output_path, claimed):
+                continue
+            if self._up_to_date(file, output_path):
+                up_to_date += 1
+                continue
+            if isinstance(file, os.DirEntry):
+                sizes.append(file.stat().st_size)
+            else:
+                sizes.append(os.stat(file).st_size)
+            jobs.append((os.fspath(file), output_path))
+        if not jobs:
+            return up_to_date
+        logger.info(f"Converting {len(jobs)} files ({sum(sizes) / (1 << 20):.1f} MB)")
+
+        if max_workers is None:
+            max_workers = _default_workers()
+        workers = min(max_workers, len(jobs))
+
+        # Largest files first, each into the group with the least data so
+        # far (then the fewest files, so empty inputs still spread out),
+        # so the groups finish at about the same time
+        groups = [[] for _ in range(workers)]
+        loads = [0] * workers
+        for size, job in sorted(zip(sizes, jobs), key=lambda item: -item[0]):
+            i = min(range(workers), key=lambda i: (loads[i], len(groups[i])))
+            groups[i].append(job)
+            loads[i] += size
+        groups = [group for group in groups if group]
+
+        # The work happens in the ffmpeg child processes, so threads that
+        # only wait on them are enough to keep every worker busy
+        overall = None
+        if progress_bars and tqdm is not None:
+            overall = tqdm(total=len(jobs), desc="total", unit="file")
+
+        successful = up_to_date
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = {}
+            for position, group in enumerate(groups, 1):
+                if overall is not None:
+                    future = ex.submit(
+                        self._convert_group_with_bar, group, progress_callback, position
+                    )
+                else:
+                    future = ex.submit(self._convert_group, group, progress_callback)
+                futures[future] = group
+            for future in as_completed(futures):
+                successful += future.result()
+                if overall is not None:
+                    overall.update(len(futures[future]))
+        if overall is not None:
+            overall.close()
+        return successful
+
+    async def batch_convert_async(self, files, progress_callback=None, max_workers=None):
+        """Convert several videos concurrently from one asyncio event loop.
+
+        Each file gets its own ffmpeg process, at most ``max_workers`` at
+        a time, and the loop reads all of their output, so no thread is
+        needed per conversion. Returns the number of converted files.
+        """
+        if not self.check_ffmpeg_installed():
+            logger.error("FFmpeg not found")
+            return 0
+
+        files = list(files)
+        claimed = set()
+        semaphore = asyncio.Semaphore(max_workers or _default_workers())
+
+        async def convert(file):
+            async with semaphore:
+                return await self._convert_async(file, progress_callback, claimed)
+
+        results = await asyncio.gather(
+            *(convert(file) for file in files), return_exceptions=True
+        )
+        successful = 0
+        for file, result in zip(files, results):
+            # CancelledError is a BaseException, not an Exception
+            if isinstance(result, BaseException):
+                logger.error(f"Error converting {os.fspath(file)}: {result!r}")
+            elif result:
+                successful += 1
+        return successful
+
+    async def _convert_async(self, input_file, progress_callback=None, claimed=None):
+        input_file = os.fspath(input_file)
+        output_path = self._prepare(input_file)
+        if output_path is None:
             return False
+        # Nothing is awaited between _prepare and the claim, so concurrent
+        # tasks can't both take the same output
+        if claimed is not None and not self._claim_output(input_file, output_path, claimed):
+            return False
+        if self._up_to_date(input_file, output_path):
+            return True
+
+        if self.stream_copy and self.output_format in _COPY_CODECS:
+            # Deciding on a stream copy runs ffprobe, keep it off the loop
+            output_args = await asyncio.get_running_loop().run_in_executor(
+                None, self._output_args, input_file, output_path
+            )
+        else:
+            output_args = self._output_args(input_file, output_path)
+        cmd = self._build_cmd([input_file], [output_args], progress_callback)
 
-    def get_video_duration(self, file_path):
+        process = None
         try:
-            cmd = [
-                "ffprobe",
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                str(file_path),
-            ]
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True)
-            return float(result.stdout.strip())
-        except Exception:
+            if progress_callback:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+                )
+                stream = process.stdout
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+                )
+                stream = process.stderr
+
+            durations = {}
+            log_tail = collections.deque(maxlen=64)
+            async for line in stream:
+                line = line.decode(errors="replace")
+                if progress_callback:
+                    self._handle_output_line(
+                        line, [input_file], durations, log_tail, progress_callback
+                    )
+                else:
+                    log_tail.append(line)
+            await process.wait()
+
+            if process.returncode == 0:
+                self._finish(input_file, output_path)
+                return True
+            else:
+                logger.error(f"Error converting {input_file}: {''.join(log_tail)}")
+                return False
+        finally:
+            # Don't leave ffmpeg running if the task was cancelled
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
+            self._discard_part(output_path)
+
+    def _convert_group_with_bar(self, jobs, progress_callback, position):
+        """Run ``_convert_group`` with a tqdm bar that lives only while it runs."""
+        desc = os.path.basename(jobs[0][0])
+        if len(jobs) > 1:
+            desc += f" (+{len(jobs) - 1})"
+        bar = tqdm(total=100, desc=desc, position=position, leave=False,
+                   bar_format="{l_bar}{bar}| {n:.0f}%")
+        progress_by_file = {}
+
+        # The group is done when its slowest file is
+        def update(filename, progress):
+            progress_by_file[filename] = progress
+            bar.n = min(progress_by_file.values())
+            bar.refresh()
+            if progress_callback:
+                progress_callback(filename, progress)
+
+        try:
+            return self._convert_group(jobs, update)
+        finally:
+            bar.close()
+
+    def _convert_group(self, jobs, progress_callback=None):
+        """Convert ``(input_file, output_path)`` pairs with a single ffmpeg run.
+
+        One process with an ``-i``/``-map`` pair per file pays ffmpeg's
+        startup and codec setup once for the whole group. If that run
+        fails, the files are retried one at a time so a single bad input
+        doesn't sink the rest.
+        """
+        outputs = [
+            ["-map", f"{i}:a:0", *self._output_args(file, output_path)]
+            for i, (file, output_path) in enumerate(jobs)
+        ]
+        try:
+            returncode, log = self._run_ffmpeg(
+                [file for file, _ in jobs], outputs, progress_callback
+            )
+            if returncode == 0:
+                for file, output_path in jobs:
+                    self._finish(file, output_path)
+                return len(jobs)
+        finally:
+            for _, output_path in jobs:
+                self._discard_part(output_path)
+
+        if len(jobs) == 1:
+            logger.error(f"Error converting {jobs[0][0]}: {log}")
             return 0
 
-    def convert_video_to_audio(self, input_file, progress_callback=None):
-        input_path = Path(input_file)
+        logger.warning(
+            f"Batch conversion failed, retrying {len(jobs)} files one by one: {log}"
+        )
+        successful = 0
+        for file, _ in jobs:
+            if self.convert_video_to_audio(file, progress_callback):
+                successful += 1
+        return successful
+
+    def _prepare(self, input_file):
+        """Validate ``input_file`` and return its output path, or None to skip it."""
+        # Plain string handling, ffmpeg only needs str paths anyway
+        input_file = os.fspath(input_file)
+        ext = os.path.splitext(input_file)[1]
 
         # Check if input format is supported
-        if input_path.suffix.lower() not in self.supported_input_formats:
-            logger.error(f"Formato input non supportato: {input_path.suffix}")
+        if ext.lower() not in SUPPORTED_INPUT_FORMATS:
+            logger.error(f"Formato input non supportato: {ext}")
             logger.error(
-                f"Formati supportati: {
-                    ', '.join(self.supported_input_formats)}"
+                f"Formati supportati: {', '.join(SUPPORTED_INPUT_FORMATS)}"
             )
-            return False
+            return None
 
         # Check if output format is supported
-        if self.output_format not in self.supported_output_formats:
-            logger.error(f"Formato output non supportato: {
-                         self.output_format}")
+        if self.output_format not in SUPPORTED_OUTPUT_FORMATS:
+            logger.error(f"Formato output non supportato: {self.output_format}")
             logger.error(
-                f"Formati supportati: {
-                    ', '.join(self.supported_output_formats)}"
+                f"Formati supportati: {', '.join(SUPPORTED_OUTPUT_FORMATS)}"
+            )
+            return None
+
+        output_path = self._output_path(input_file)
+        if not self.overwrite and os.path.exists(output_path):
+            logger.warning(f"{output_path} exists, skipping.")
+            return None
+
+        return output_path
+
+    def _claim_output(self, input_file, output_path, claimed):
+        """Reserve ``output_path`` for ``input_file`` within one batch.
+
+        Inputs with the same stem (clip.mp4 and clip.mkv) map to the same
+        output; only the first valid one may write it. Returns False if
+        an earlier input already claimed it.
+        """
+        key = os.path.normcase(os.path.abspath(output_path))
+        if key in claimed:
+            logger.warning(
+                f"{os.fspath(input_file)} would also write {output_path}, skipping."
             )
             return False
+        claimed.add(key)
+        return True
 
-        # Determine output path
+    def _output_path(self, input_file):
+        input_file = os.fspath(input_file)
+        stem = os.path.splitext(os.path.basename(input_file))[0]
+        output_name = f"{stem}.{self.output_format}"
         if self.output_dir:
-            output_path = Path(self.output_dir) / (
-                input_path.stem + f".{self.output_format}"
-            )
-        else:
-            output_path = input_path.with_suffix(f".{self.output_format}")
+            return os.path.join(self.output_dir, output_name)
+        return os.path.join(os.path.dirname(input_file), output_name)
 
-        if output_path.exists() and not self.overwrite:
-            logger.warning(f"{output_path} exists, skipping.")
-            return False
+    def _up_to_date(self, input_file, output_path):
+        """Return True if ``output_path`` is newer than ``input_file``.
 
-        duration = self.get_video_duration(input_file)
+        Only reached with ``overwrite`` on, since otherwise an existing
+        output is skipped by ``_prepare``. ``force`` re-encodes anyway.
+        """
+        if self.force:
+            return False
+        try:
+            output_mtime = os.stat(output_path).st_mtime
+            if isinstance(input_file, os.DirEntry):
+                input_mtime = input_file.stat().st_mtime
+            else:
+                input_mtime = os.stat(input_file).st_mtime
+        except FileNotFoundError:
+            return False
+        if output_mtime < input_mtime:
+            return False
+        logger.info(f"{output_path} is up to date, skipping.")
+        return True
+
+    def _output_args(self, input_file, output_path):
+        # The source audio may already be in the target codec, then it is
+        # remuxed instead of decoded and encoded again
+        args = self._copy_args if self._can_copy(input_file) else self._encode_args
+        # Write next to the final file and only rename on success, so an
+        # interrupted run never leaves a truncated file that later runs
+        # would skip as already converted
+        return [*args, f"{output_path}.part"]
+
+    def _discard_part(self, output_path):
+        try:
+            os.remove(f"{output_path}.part")
+        except FileNotFoundError:
+            pass
 
-        # Build FFmpeg command based on output format
-        if self.output_format == "mp3":
-            audio_codec = "libmp3lame"
-        elif self.output_format == "wav":
-            audio_codec = "pcm_s16le"
-        else:
-            audio_codec = "libmp3lame"  # default
+    def _can_copy(self, input_file):
+        copy_codec = _COPY_CODECS.get(self.output_format)
+        if not self.stream_copy or copy_codec is None:
+            return False
+        return self._probe_audio_codec(input_file) == copy_codec
 
+    def _probe_audio_codec(self, input_file):
+        """Return the codec name of the first audio stream, or None."""
         cmd = [
-            "ffmpeg",
-            "-i",
-            str(input_file),
-            "-vn",  # no video
-            "-acodec",
-            audio_codec,
-            "-ab",
-            self.bitrate,
-            "-ar",
-            str(self.samplerate),
-            "-y" if self.overwrite else "-n",
-            "-loglevel",
+            "ffprobe",
+            "-v",
             "error",
-            str(output_path),
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=codec_name",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(input_file),
         ]
-
+        try:
+            result = subprocess.run(
+                cmd, capture_output=True, text=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        return result.stdout.strip() or None
+
+    def _finish(self, input_file, output_path):
+        os.replace(f"{output_path}.part", output_path)
+        logger.info(f"Converted: {input_file} -> {output_path}")
+        if self.delete_original:
+            os.remove(input_file)
+
+    def _run_ffmpeg(self, inputs, outputs, progress_callback=None):
+        """Run one ffmpeg process over ``inputs`` writing each of ``outputs``.
+
+        Returns the exit code together with the tail of ffmpeg's log.
+        """
+        cmd = self._build_cmd(inputs, outputs, progress_callback)
+        if progress_callback:
+            return self._run_with_progress(cmd, inputs, progress_callback)
+        return self._run_sync(cmd)
+
+    def _run_sync(self, cmd):
+        # Nothing has to be read while ffmpeg runs and at "-loglevel error"
+        # its stderr is only a few lines, so a plain run() is enough.
+        # stderr stays bytes and is only decoded when the conversion fails.
+        result = subprocess.run(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False
+        )
+        if result.returncode == 0:
+            return 0, ""
+        log = result.stderr.decode(errors="replace")
+        return result.returncode, "".join(log.splitlines(keepends=True)[-64:])
+
+    def _run_with_progress(self, cmd, inputs, progress_callback):
+        # Progress and log lines share one pipe and are read right here as
+        # ffmpeg writes them, so no monitor thread or polling is needed
         process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
+            # The "info" log carries metadata and filenames in whatever
+            # encoding, which must not abort the read loop
+            encoding="utf-8",
+            errors="replace",
         )
-
-        if duration > 0 and progress_callback:
-            t = threading.Thread(
-                target=self.monitor_progress,
-                args=(process, duration, progress_callback, input_file),
-            )
-            t.daemon = True
-            t.start()
-
-        stdout, stderr = process.communicate()
-        if process.returncode == 0:
-            logger.info(f"Converted: {input_file} -> {output_path}")
-            if self.delete_original:
-                os.remove(input_file)
-            return True
+        # Only the end of ffmpeg's log is kept for the error message, so
+        # memory stays bounded however long the encode runs
+        log_tail = collections.deque(maxlen=64)
+        durations = {}
+        finished = False
+        try:
+            for line in process.stdout:
+                self._handle_output_line(
+                    line, inputs, durations, log_tail, progress_callback
+                )
+            finished = True
+        finally:
+            # Don't leave ffmpeg writing a .part file the caller is about
+            # to remove if the loop stopped early, e.g. a raising callback
+            if not finished:
+                process.kill()
+            process.wait()
+            process.stdout.close()
+        return process.returncode, "".join(log_tail)
+
+    def _build_cmd(self, inputs, outputs, progress_callback=None):
+        cmd = list(_FFMPEG_PROGRESS_HEAD if progress_callback else _FFMPEG_HEAD)
+        for input_file in inputs:
+            cmd += [*self._input_args, "-i", input_file]
+        for output in outputs:
+            cmd += output
+        return cmd
+
+    def _handle_output_line(self, line, inputs, durations, log_tail, progress_callback):
+        """Handle one line of ffmpeg's merged -progress and log output.
+
+        ffmpeg encodes all outputs side by side, so each file's progress
+        is the shared position over that file's own duration. Durations
+        are collected into ``durations`` keyed by input index, and log
+        lines into ``log_tail``.
+        """
+        key, sep, value = line.strip().partition("=")
+        if sep and key.isidentifier():
+            if key == "out_time_us" and value.isdigit():
+                for i, filename in enumerate(inputs):
+                    duration = durations.get(i)
+                    if duration:
+                        progress = int(value) / (duration * 1e6) * 100
+                        # 100 is reported once, by progress=end below
+                        progress_callback(filename, min(99.9, progress))
+            elif key == "progress" and value == "end":
+                for filename in inputs:
+                    progress_callback(filename, 100)
+            return
+
+        match = _INPUT_RE.match(line)
+        if match:
+            # Unknown until its Duration line; "Duration: N/A" leaves it so
+            durations[int(match.group(1))] = None
         else:
-            logger.error(f"Error converting {input_file}: {stderr}")
-            return False
-
-    def monitor_progress(self, process, duration, callback, filename):
-        start = time.time()
-        while process.poll() is None:
-            elapsed = time.time() - start
-            progress = min(100, (elapsed / duration) * 100)
-            callback(filename, progress)
-            time.sleep(0.5)
-        callback(filename, 100)
+            match = _DURATION_RE.match(line)
+            if match and durations:
+                hours, minutes, seconds = match.groups()
+                # The Duration belongs to the most recent Input header
+                durations[next(reversed(durations))] = (
+                    int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+                )
+        log_tail.append(line)
 
 
 # Wrapper for tests
@@ -199,10 +653,15 @@ if __name__ == "__main__":
         sys.exit(1)
 
     # Cerca file video supportati nella cartella
-    video_files = []
-    for fmt in converter.supported_input_formats:
-        video_files.extend(Path(".").glob(f"*{fmt}"))
-        video_files.extend(Path(".").glob(f"*{fmt.upper()}"))
+    # Una sola scansione della cartella, estensioni senza distinzione maiuscole
+    with os.scandir(".") as entries:
+        video_files = [
+            entry
+            for entry in entries
+            if entry.is_file()
+            and os.path.splitext(entry.name)[1].lower()
+            in converter.supported_input_formats
+        ]
 
     if not video_files:
         print("❌ Nessun file video supportato trovato!")
@@ -215,17 +674,19 @@ if __name__ == "__main__":
 
     # Seleziona file
     if len(video_files) == 1:
-        video_file = str(video_files[0])
+        video_file = video_files[0].name
         print(f"📹 Trovato file: {video_file}")
     else:
         print("📹 File video trovati:")
-        for i, file in enumerate(video_files, 1):
-            print(f"  {i}. {file.name}")
+        for i, entry in enumerate(video_files, 1):
+            # La dimensione arriva dalla stessa scansione, senza altri stat
+            size_mb = entry.stat().st_size / (1 << 20)
+            print(f"  {i}. {entry.name} ({size_mb:.1f} MB)")
 
         try:
             scelta = int(
                 input("\nScegli il numero del file da convertire: ")) - 1
-            video_file = str(video_files[scelta])
+            video_file = video_files[scelta].name
         except (ValueError, IndexError):
             print("❌ Scelta non valida!")
             sys.exit(1)
@@ -234,13 +695,21 @@ if __name__ == "__main__":
     print("\n🎵 Formati output disponibili:")
     print("  1. MP3 (consigliato)")
     print("  2. WAV (qualità superiore)")
+    print("  3. M4A (AAC, nessuna ricodifica se il video è già AAC)")
+    print("  4. FLAC (senza perdita)")
 
     try:
         formato_scelta = input(
-            "Scegli il formato output (1-2, default: 1): ").strip()
+            "Scegli il formato output (1-4, default: 1): ").strip()
         if formato_scelta == "2":
             output_format = "wav"
             bitrate = "320k"  # Migliore qualità per WAV
+        elif formato_scelta == "3":
+            output_format = "m4a"
+            bitrate = "192k"
+        elif formato_scelta == "4":
+            output_format = "flac"
+            bitrate = "320k"  # Ignorato, FLAC è senza perdita
         else:
             output_format = "mp3"
             bitrate = "192k"
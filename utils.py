@@ -1,5 +1,14 @@
 import re
+import string
+
+_ALLOWED = frozenset(string.ascii_letters + string.digits + "_-. ")
+# ASCII characters outside the allowed set map to "_"
+_TABLE = str.maketrans({c: "_" for c in map(chr, range(128)) if c not in _ALLOWED})
+# Non-ASCII names need Unicode-aware \w
+_RE = re.compile(r"[^\w\-_\. ]")
 
 
 def sanitize_filename(filename: str) -> str:
-    return re.sub(r"[^\w\-_\. ]", "_", filename)
+    if filename.isascii():
+        return filename.translate(_TABLE)
+    return _RE.sub("_", filename)